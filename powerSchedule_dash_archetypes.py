@@ -0,0 +1,101 @@
+import plotly.graph_objects as go
+import dash
+from dash import dcc, html
+from dash.dependencies import Input, Output
+
+from powerschedule_cluster import fit_archetypes
+from powerschedule_fleet import MOBILITY_NEEDS, PROFILE_NAMES, generate_fleet, time_axis
+
+# Constants
+NUM_VEHICLES = 20_000  # Fleet size
+NUM_ARCHETYPES = 12  # Archetypes shown instead of individual vehicles
+SEED = 42
+
+# Generate the fleet and group it into archetypes: the charts below only
+# ever draw the archetypes, so their cost grows with K, not the fleet size
+fleet = generate_fleet(NUM_VEHICLES, SEED)
+archetypes = fit_archetypes(fleet, NUM_ARCHETYPES, rng=SEED)
+del fleet
+
+# Largest archetypes first
+order = archetypes["counts"].argsort()[::-1]
+hours = time_axis(archetypes["centers"].shape[-1], archetypes["resolution"])
+
+# Dash Application
+app = dash.Dash(__name__)
+
+app.layout = html.Div(
+    [
+        html.H1("EV Charging Archetypes"),
+        dcc.Dropdown(
+            id="archetype-dropdown",
+            options=[
+                {
+                    "label": f"Archetype {i} ({archetypes['counts'][i]} vehicles)",
+                    "value": int(i),
+                }
+                for i in order
+            ],
+            value=int(order[0]),
+            clearable=False,
+        ),
+        dcc.Graph(id="archetype-chart"),
+        dcc.Graph(id="archetype-counts-chart"),
+    ]
+)
+
+
+@app.callback(Output("archetype-chart", "figure"), Input("archetype-dropdown", "value"))
+def update_graph(archetype):
+    center = archetypes["centers"][archetype]
+
+    # Stacked bars for the charging sources of the archetype
+    traces = [
+        go.Bar(x=hours, y=center[i], name=name) for i, name in enumerate(PROFILE_NAMES)
+    ]
+
+    # Add a line trace for Mobility Needs
+    traces.append(
+        go.Scatter(
+            x=hours,
+            y=center[archetypes["sources"].index(MOBILITY_NEEDS)],
+            mode="lines",
+            line=dict(color="red", dash="dot"),
+            name=MOBILITY_NEEDS,
+        )
+    )
+
+    fig = go.Figure(traces)
+    fig.update_layout(
+        barmode="stack",
+        title=(
+            f"Archetype {archetype}: {archetypes['counts'][archetype]} vehicles, "
+            f"max error {archetypes['max_error'][archetype]:.1f} kWh, "
+            f"RMS error {archetypes['rms_error'][archetype]:.1f} kWh"
+        ),
+        xaxis_title="Time (Hours)",
+        yaxis_title="Power Schedule (kWh)",
+    )
+    return fig
+
+
+@app.callback(
+    Output("archetype-counts-chart", "figure"), Input("archetype-dropdown", "id")
+)
+def update_counts(_):
+    fig = go.Figure(
+        go.Bar(
+            x=[f"Archetype {i}" for i in order],
+            y=archetypes["counts"][order],
+        )
+    )
+    fig.update_layout(
+        title="Vehicles per Archetype",
+        yaxis_title="Vehicles",
+    )
+    return fig
+
+
+# Run the Dash app
+if __name__ == "__main__":
+    app.run(debug=True)
@@ -0,0 +1,129 @@
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import dash
+from dash import dcc, html
+from dash.dependencies import Input, Output
+
+from powerschedule_fleet import (
+    MOBILITY_NEEDS,
+    PROFILE_NAMES,
+    SOURCE_NAMES,
+    generate_fleet,
+    time_axis,
+)
+from powerschedule_heatmap import (
+    ALL_CHARGING,
+    MAX_ROWS,
+    ROW_AGGREGATES,
+    ROW_ORDERS,
+    heatmap_rows,
+    power_matrix,
+)
+
+# Constants
+NUM_VEHICLES = 50_000  # Fleet size
+RESOLUTION = 15  # Slot length (in minutes)
+SEED = 42
+
+# Generate the fleet once; the callbacks only send the ordered/binned rows
+fleet = generate_fleet(NUM_VEHICLES, SEED, resolution=RESOLUTION)
+hours = time_axis(fleet.shape[-1], RESOLUTION)
+mean_mobility_needs = fleet[:, SOURCE_NAMES.index(MOBILITY_NEEDS)].mean(axis=0)
+
+# Dash Application
+app = dash.Dash(__name__)
+
+
+def dropdown(component_id, options, value):
+    return dcc.Dropdown(
+        id=component_id,
+        options=[{"label": option, "value": option} for option in options],
+        value=value,
+        clearable=False,
+        style={"width": "220px", "display": "inline-block", "marginRight": "12px"},
+    )
+
+
+app.layout = html.Div(
+    [
+        html.H1(f"EV Fleet Charging Heatmap ({NUM_VEHICLES} vehicles)"),
+        dropdown("source-dropdown", [ALL_CHARGING] + PROFILE_NAMES, ALL_CHARGING),
+        dropdown("order-dropdown", ROW_ORDERS, ROW_ORDERS[0]),
+        dropdown("aggregate-dropdown", ROW_AGGREGATES, ROW_AGGREGATES[0]),
+        dcc.Graph(id="fleet-heatmap-chart", style={"height": "900px"}),
+    ]
+)
+
+
+@app.callback(
+    Output("fleet-heatmap-chart", "figure"),
+    Input("source-dropdown", "value"),
+    Input("order-dropdown", "value"),
+    Input("aggregate-dropdown", "value"),
+)
+def update_graph(source, order, aggregate):
+    matrix = power_matrix(fleet, source)
+    rows, labels = heatmap_rows(matrix, order, aggregate, MAX_ROWS)
+
+    fig = make_subplots(
+        rows=2,
+        cols=1,
+        shared_xaxes=True,
+        row_heights=[0.25, 0.75],
+        vertical_spacing=0.03,
+    )
+
+    # WebGL line overlays: fleet mean power and mean mobility needs
+    fig.add_trace(
+        go.Scattergl(
+            x=hours,
+            y=matrix.mean(axis=0),
+            mode="lines",
+            name=f"Mean {source}",
+        ),
+        row=1,
+        col=1,
+    )
+    fig.add_trace(
+        go.Scattergl(
+            x=hours,
+            y=mean_mobility_needs,
+            mode="lines",
+            line=dict(color="red", dash="dot"),
+            name=f"Mean {MOBILITY_NEEDS}",
+        ),
+        row=1,
+        col=1,
+    )
+
+    # The whole fleet as a single heatmap trace, one row per vehicle bin
+    fig.add_trace(
+        go.Heatmap(
+            x=hours,
+            y=labels,
+            z=rows,
+            colorscale="Viridis",
+            colorbar=dict(title="kWh", y=0.375, len=0.75),
+            hovertemplate=(
+                f"Vehicles at %{{y}} by {order}<br>Hour %{{x}}<br>"
+                "%{z:.1f} kWh<extra></extra>"
+            ),
+        ),
+        row=2,
+        col=1,
+    )
+
+    fig.update_yaxes(title_text="Power Schedule (kWh)", row=1, col=1)
+    fig.update_yaxes(
+        title_text=f"Vehicles (by {order})", showticklabels=False, row=2, col=1
+    )
+    fig.update_xaxes(title_text="Time (Hours)", row=2, col=1)
+    fig.update_layout(
+        title=f"{source} per Vehicle Over Time ({aggregate} of {len(labels)} rows)",
+    )
+    return fig
+
+
+# Run the Dash app
+if __name__ == "__main__":
+    app.run(debug=True)
@@ -0,0 +1,110 @@
+import plotly.graph_objects as go
+import dash
+from dash import dcc, html
+from dash.dependencies import Input, Output
+
+from powerschedule_fleet import (
+    SOURCE_NAMES,
+    TIME_PERIOD,
+    iter_fleet_chunks,
+    slots_per_hour,
+    time_axis,
+)
+from powerschedule_stats import fleet_statistics
+
+# Constants
+NUM_VEHICLES = 200_000  # Fleet size
+CHUNK_SIZE = 10_000  # Vehicles generated at a time
+RESOLUTION = 60  # Slot length (in minutes)
+SEED = 42
+
+# Stream the fleet chunk by chunk into fixed-size statistics: only one chunk
+# is ever in memory, and the charts only draw the per-slot summaries
+stats = fleet_statistics(
+    iter_fleet_chunks(NUM_VEHICLES, CHUNK_SIZE, seed=SEED, resolution=RESOLUTION),
+    TIME_PERIOD * slots_per_hour(RESOLUTION),
+    RESOLUTION,
+    rng=SEED,
+)
+summary = stats.to_dataframe()
+hours = time_axis(stats.num_slots, RESOLUTION)
+energy_quantiles = stats.energy_quantiles()
+
+# Dash Application
+app = dash.Dash(__name__)
+
+app.layout = html.Div(
+    [
+        html.H1(f"EV Fleet Distributions ({stats.num_vehicles} vehicles)"),
+        dcc.Dropdown(
+            id="source-dropdown",
+            options=[{"label": name, "value": name} for name in SOURCE_NAMES],
+            value=SOURCE_NAMES[0],
+            clearable=False,
+        ),
+        dcc.Graph(id="distribution-chart"),
+        dcc.Graph(id="energy-chart"),
+    ]
+)
+
+
+@app.callback(Output("distribution-chart", "figure"), Input("source-dropdown", "value"))
+def update_graph(source):
+    data = summary[summary["Profile"] == source]
+
+    # Min-max and median-P95 bands around the mean
+    fig = go.Figure(
+        [
+            go.Scatter(
+                x=hours,
+                y=data["Max"],
+                mode="lines",
+                line=dict(width=0),
+                showlegend=False,
+            ),
+            go.Scatter(
+                x=hours,
+                y=data["Min"],
+                mode="lines",
+                line=dict(width=0),
+                fill="tonexty",
+                fillcolor="rgba(99, 110, 250, 0.15)",
+                name="Min-Max",
+            ),
+            go.Scatter(x=hours, y=data["P95"], mode="lines", name="P95"),
+            go.Scatter(x=hours, y=data["P50"], mode="lines", name="Median"),
+            go.Scatter(
+                x=hours,
+                y=data["Mean"],
+                mode="lines",
+                line=dict(color="red", dash="dot"),
+                name="Mean",
+            ),
+        ]
+    )
+    fig.update_layout(
+        title=f"{source} per Vehicle Over Time",
+        xaxis_title="Time (Hours)",
+        yaxis_title="Power Schedule (kWh)",
+    )
+    return fig
+
+
+@app.callback(Output("energy-chart", "figure"), Input("source-dropdown", "id"))
+def update_energy(_):
+    fig = go.Figure(
+        [
+            go.Bar(x=SOURCE_NAMES, y=energy_quantiles[0], name="Median"),
+            go.Bar(x=SOURCE_NAMES, y=energy_quantiles[1], name="P95"),
+        ]
+    )
+    fig.update_layout(
+        title="Daily Energy per Vehicle",
+        yaxis_title="Energy (kWh)",
+    )
+    return fig
+
+
+# Run the Dash app
+if __name__ == "__main__":
+    app.run(debug=True)
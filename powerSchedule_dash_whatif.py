@@ -0,0 +1,127 @@
+import threading
+import time
+
+import plotly.graph_objects as go
+import dash
+from dash import dcc, html
+from dash.dependencies import Input, Output
+
+from powerschedule_fleet import (
+    MOBILITY_NEEDS,
+    POWER_MAX,
+    POWER_MIN,
+    PRIORITY_WINDOWS,
+    PROFILE_NAMES,
+    SOURCE_NAMES,
+    time_axis,
+)
+from powerschedule_pipeline import fleet_pipeline, priority_window_params
+
+# Constants
+NUM_VEHICLES = 20_000  # Fleet size
+SEED = 42
+
+
+# Mean per-vehicle profiles as stacked bars, with the mobility needs line
+def make_figure(aggregates, resolution, num_vehicles):
+    hours = time_axis(aggregates.shape[-1], resolution)
+    means = aggregates / num_vehicles
+    traces = [
+        go.Bar(x=hours, y=means[SOURCE_NAMES.index(name)], name=name)
+        for name in PROFILE_NAMES
+    ]
+    traces.append(
+        go.Scatter(
+            x=hours,
+            y=means[SOURCE_NAMES.index(MOBILITY_NEEDS)],
+            mode="lines",
+            line=dict(color="red", dash="dot"),
+            name=MOBILITY_NEEDS,
+        )
+    )
+    fig = go.Figure(traces)
+    fig.update_layout(
+        barmode="stack",
+        title="Mean EV Charging and Mobility Needs Profiles per Vehicle",
+        xaxis_title="Time (Hours)",
+        yaxis_title="Power Schedule (kWh)",
+    )
+    return fig
+
+
+# The random draws are kept by the pipeline: moving a slider only recomputes
+# the stages that depend on it. The dev server is threaded, so callbacks
+# take the lock around set()/get() to keep one parameter set at a time.
+pipeline = fleet_pipeline(num_vehicles=NUM_VEHICLES, seed=SEED)
+pipeline_lock = threading.Lock()
+pipeline.add_stage(
+    "figure",
+    make_figure,
+    params=("resolution", "num_vehicles"),
+    inputs=("aggregates",),
+)
+
+
+def window_slider(component_id, name):
+    start, end = PRIORITY_WINDOWS[name]["windows"][0]
+    return html.Div(
+        [
+            html.Label(f"{name} priority window (hours)"),
+            dcc.RangeSlider(id=component_id, min=0, max=24, step=1, value=[start, end]),
+        ]
+    )
+
+
+# Dash Application
+app = dash.Dash(__name__)
+
+app.layout = html.Div(
+    [
+        html.H1(f"EV Charging What-If ({NUM_VEHICLES} vehicles)"),
+        html.Label("Power range (kWh)"),
+        dcc.RangeSlider(
+            id="power-slider", min=0, max=100, step=1, value=[POWER_MIN, POWER_MAX]
+        ),
+        window_slider("solar-window-slider", "Solar Power"),
+        window_slider("surplus-window-slider", "Surplus Solar"),
+        dcc.Graph(id="charging-profile-chart"),
+        html.Div(id="recompute-info"),
+    ]
+)
+
+
+@app.callback(
+    Output("charging-profile-chart", "figure"),
+    Output("recompute-info", "children"),
+    Input("power-slider", "value"),
+    Input("solar-window-slider", "value"),
+    Input("surplus-window-slider", "value"),
+)
+def update_graph(power_range, solar_window, surplus_window):
+    started = time.perf_counter()
+    priority_windows = {
+        **PRIORITY_WINDOWS,
+        "Solar Power": {
+            **PRIORITY_WINDOWS["Solar Power"],
+            "windows": [tuple(solar_window)],
+        },
+        "Surplus Solar": {
+            **PRIORITY_WINDOWS["Surplus Solar"],
+            "windows": [tuple(surplus_window)],
+        },
+    }
+    with pipeline_lock:
+        pipeline.set(
+            priority_window_params(priority_windows),
+            power_min=power_range[0],
+            power_max=power_range[1],
+        )
+        fig = pipeline.get("figure")
+        recomputed = ", ".join(pipeline.recomputed) or "nothing"
+    elapsed = (time.perf_counter() - started) * 1000
+    return fig, f"Recomputed {recomputed} in {elapsed:.0f} ms"
+
+
+# Run the Dash app
+if __name__ == "__main__":
+    app.run(debug=True)
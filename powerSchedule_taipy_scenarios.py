@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+import taipy as tp
+from taipy import Config, Scope
+from taipy.gui import Gui
+
+from powerschedule_fleet import (
+    MOBILITY_NEEDS,
+    POWER_MAX,
+    POWER_MIN,
+    PRIORITY_WINDOWS,
+    RESOLUTION,
+    SOURCE_NAMES,
+    TIME_PERIOD,
+    assemble_fleet,
+    build_mobility_needs,
+    build_power_levels,
+    build_step_schedules,
+    draw_fleet,
+    time_axis,
+)
+
+# Constants
+NUM_VEHICLES = 20_000  # Fleet size
+SEED = 42
+
+
+# Task functions: each task is skippable, so Taipy only re-runs it when one
+# of its input data nodes was written since its outputs were
+def draw(num_vehicles, seed, time_period):
+    return draw_fleet(num_vehicles, seed, time_period)
+
+
+def build_schedules(draws, power_min, power_max, priority_windows):
+    power_levels = build_power_levels(
+        draws["level_draws"], power_min, power_max, priority_windows
+    )
+    return build_step_schedules(draws["step_starts"], power_levels)
+
+
+def build_needs(draws, power_min, power_max):
+    return build_mobility_needs(draws["mobility_draws"], power_min, power_max)
+
+
+# Mean per-vehicle profiles (sources, slots): the only thing sent to the GUI
+def aggregate(schedules, mobility_needs, resolution):
+    return assemble_fleet(schedules, mobility_needs, resolution).mean(
+        axis=0, dtype=np.float64
+    )
+
+
+# Taipy Core configuration
+def data_node(name, default_data=None):
+    return Config.configure_data_node(
+        name, storage_type="pickle", scope=Scope.SCENARIO, default_data=default_data
+    )
+
+
+num_vehicles_cfg = data_node("num_vehicles", NUM_VEHICLES)
+seed_cfg = data_node("seed", SEED)
+time_period_cfg = data_node("time_period", TIME_PERIOD)
+power_min_cfg = data_node("power_min", POWER_MIN)
+power_max_cfg = data_node("power_max", POWER_MAX)
+priority_windows_cfg = data_node("priority_windows", PRIORITY_WINDOWS)
+resolution_cfg = data_node("resolution", RESOLUTION)
+draws_cfg = data_node("draws")
+schedules_cfg = data_node("schedules")
+mobility_needs_cfg = data_node("mobility_needs")
+profile_means_cfg = data_node("profile_means")
+
+draw_task_cfg = Config.configure_task(
+    "draw",
+    draw,
+    [num_vehicles_cfg, seed_cfg, time_period_cfg],
+    draws_cfg,
+    skippable=True,
+)
+schedules_task_cfg = Config.configure_task(
+    "build_schedules",
+    build_schedules,
+    [draws_cfg, power_min_cfg, power_max_cfg, priority_windows_cfg],
+    schedules_cfg,
+    skippable=True,
+)
+needs_task_cfg = Config.configure_task(
+    "build_needs",
+    build_needs,
+    [draws_cfg, power_min_cfg, power_max_cfg],
+    mobility_needs_cfg,
+    skippable=True,
+)
+aggregate_task_cfg = Config.configure_task(
+    "aggregate",
+    aggregate,
+    [schedules_cfg, mobility_needs_cfg, resolution_cfg],
+    profile_means_cfg,
+    skippable=True,
+)
+scenario_cfg = Config.configure_scenario(
+    "fleet",
+    [draw_task_cfg, schedules_task_cfg, needs_task_cfg, aggregate_task_cfg],
+)
+
+# Results memoized per parameter tuple, and one scenario per fleet (vehicles,
+# seed) whose cached draws are reused when only the power settings change
+results = {}
+scenarios = {}
+
+
+def get_scenario(num_vehicles, seed):
+    name = f"fleet-{num_vehicles}-{seed}"
+    if name not in scenarios:
+        existing = [s for s in tp.get_scenarios() if s.name == name]
+        if existing:
+            scenario = existing[0]
+        else:
+            scenario = tp.create_scenario(scenario_cfg, name=name)
+            scenario.num_vehicles.write(num_vehicles)
+            scenario.seed.write(seed)
+        scenarios[name] = scenario
+    return scenarios[name]
+
+
+# Profile means for a parameter tuple: from the memo, or by writing only the
+# data nodes that changed and submitting the scenario
+def compute_profile_means(power_min, power_max, solar_window, resolution):
+    key = (power_min, power_max, tuple(solar_window), resolution)
+    if key not in results:
+        priority_windows = {
+            **PRIORITY_WINDOWS,
+            "Solar Power": {
+                **PRIORITY_WINDOWS["Solar Power"],
+                "windows": [tuple(solar_window)],
+            },
+        }
+        scenario = get_scenario(NUM_VEHICLES, SEED)
+        for node, value in [
+            (scenario.power_min, power_min),
+            (scenario.power_max, power_max),
+            (scenario.priority_windows, priority_windows),
+            (scenario.resolution, resolution),
+        ]:
+            if node.read() != value:
+                node.write(value)
+        tp.submit(scenario, wait=True)
+        results[key] = scenario.profile_means.read()
+    return results[key]
+
+
+# One frame per source, each bound to its own GUI variable
+SOURCE_VARS = {
+    "Grid Energy": "grid_data",
+    "Solar Power": "solar_data",
+    "Surplus Solar": "surplus_data",
+    MOBILITY_NEEDS: "needs_data",
+}
+
+
+def source_frames(profile_means, resolution):
+    hours = time_axis(profile_means.shape[-1], resolution)
+    return {
+        var: pd.DataFrame(
+            {"Time (Hours)": hours, name: profile_means[SOURCE_NAMES.index(name)]}
+        )
+        for name, var in SOURCE_VARS.items()
+    }
+
+
+# Only the series that changed are assigned to the state, so the client
+# only receives those (e.g. the solar window slider only re-sends Solar Power)
+def on_change(state, var_name, value):
+    if var_name not in ("power_range", "solar_window", "resolution"):
+        return
+    resolution = int(state.resolution)
+    profile_means = compute_profile_means(
+        state.power_range[0], state.power_range[1], state.solar_window, resolution
+    )
+    for var, frame in source_frames(profile_means, resolution).items():
+        if not frame.equals(getattr(state, var)):
+            setattr(state, var, frame)
+
+
+# Initial state
+power_range = [POWER_MIN, POWER_MAX]
+solar_window = list(PRIORITY_WINDOWS["Solar Power"]["windows"][0])
+resolution = str(RESOLUTION)
+grid_data = None
+solar_data = None
+surplus_data = None
+needs_data = None
+
+# Taipy GUI Configuration
+page = """
+# EV Charging Scenarios
+
+Power range (kWh): <|{power_range}|slider|min=0|max=100|>
+
+Solar priority window (hours): <|{solar_window}|slider|min=0|max=24|>
+
+Slot length (minutes): <|{resolution}|toggle|lov=60;30;15|>
+
+<|{grid_data}|chart|type=bar|x=Time (Hours)|y=Grid Energy|height=250|>
+
+<|{solar_data}|chart|type=bar|x=Time (Hours)|y=Solar Power|height=250|>
+
+<|{surplus_data}|chart|type=bar|x=Time (Hours)|y=Surplus Solar|height=250|>
+
+<|{needs_data}|chart|x=Time (Hours)|y=Mobility Needs|color=red|height=250|>
+"""
+
+if __name__ == "__main__":
+    tp.Orchestrator().run()
+    profile_means = compute_profile_means(
+        power_range[0], power_range[1], solar_window, RESOLUTION
+    )
+    grid_data, solar_data, surplus_data, needs_data = source_frames(
+        profile_means, RESOLUTION
+    ).values()
+    Gui(page).run(title="EV Charging Scenarios")
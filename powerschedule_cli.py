@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from powerschedule_cluster import export_archetypes, fit_store_archetypes
+from powerschedule_fleet import (
+    CHUNK_SIZE,
+    PROFILE_NAMES,
+    RESOLUTION,
+    SOURCE_NAMES,
+    TIME_PERIOD,
+    iter_fleet_chunks,
+    slots_per_hour,
+)
+from powerschedule_smoothing import SMOOTHING_WINDOW
+from powerschedule_store import FleetStore, aggregate_store, export_csv
+from powerschedule_validate import validate_store
+
+# Headless batch generator: generate, aggregate, validate and export a fleet
+# without importing dash/plotly/taipy, for cron and batch nodes.
+FORMATS = ["csv", "npy", "memmap", "json"]
+
+
+# Print progress on stderr so stdout stays clean for the summary
+def progress(stage, done, total, quiet=False):
+    if not quiet:
+        end = "\n" if done == total else ""
+        print(f"\r{stage}: {done}/{total}", end=end, file=sys.stderr, flush=True)
+
+
+# Worker entry point: generate one chunk straight into the store
+def write_chunk(path, num_vehicles, chunk_size, seed, chunk_index, **kwargs):
+    store = FleetStore(path, mode="r+")
+    for start, block in iter_fleet_chunks(
+        num_vehicles, chunk_size, seed, chunks=[chunk_index], **kwargs
+    ):
+        store.write_chunk(start, block)
+    store.flush()
+    return chunk_index
+
+
+# Generate the fleet into a store at path, over a process pool if workers > 1
+def generate_store(
+    path,
+    num_vehicles,
+    seed=None,
+    chunk_size=CHUNK_SIZE,
+    time_period=TIME_PERIOD,
+    resolution=RESOLUTION,
+    workers=1,
+    quiet=False,
+):
+    store = FleetStore.create(
+        path,
+        num_vehicles,
+        time_period * slots_per_hour(resolution),
+        resolution=resolution,
+    )
+    num_chunks = -(-num_vehicles // chunk_size)
+    kwargs = {"time_period": time_period, "resolution": resolution}
+    if workers <= 1:
+        for i, (start, block) in enumerate(
+            iter_fleet_chunks(num_vehicles, chunk_size, seed, **kwargs)
+        ):
+            store.write_chunk(start, block)
+            progress("generate", i + 1, num_chunks, quiet)
+        store.flush()
+        return store
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(write_chunk, path, num_vehicles, chunk_size, seed, i, **kwargs)
+            for i in range(num_chunks)
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            future.result()
+            progress("generate", done, num_chunks, quiet)
+    return FleetStore(path)
+
+
+# Export the fleet matrix as a .npy file, one chunk at a time
+def export_npy(store, path, chunk_size=CHUNK_SIZE):
+    array = np.lib.format.open_memmap(
+        path, mode="w+", dtype=store.data.dtype, shape=store.shape
+    )
+    for start, block in store.iter_chunks(chunk_size):
+        array[start : start + len(block)] = block
+    array.flush()
+
+
+# Write the output file. With archetypes, csv and npy hold the archetypes
+# and a "-labels.npy" file maps each vehicle to its archetype.
+def export(store, archetypes, summary, path, output_format, chunk_size=CHUNK_SIZE):
+    labels_path = os.path.splitext(path)[0] + "-labels.npy"
+    if output_format == "json":
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
+    elif archetypes is not None and output_format == "csv":
+        export_archetypes(archetypes, path, labels_path)
+    elif archetypes is not None and output_format == "npy":
+        np.save(path, archetypes["centers"])
+        np.save(labels_path, archetypes["labels"].astype(np.int32))
+    elif output_format == "csv":
+        export_csv(store, path, chunk_size)
+    elif output_format == "npy":
+        export_npy(store, path, chunk_size)
+
+
+# Fleet-level summary of the aggregated totals and the validation report
+def summarize(store, totals, report):
+    slot_hours = 1 / slots_per_hour(store.resolution)
+    charging = totals[: len(PROFILE_NAMES)].sum(axis=0)
+    return {
+        "num_vehicles": store.num_vehicles,
+        "num_slots": store.num_slots,
+        "resolution": store.resolution,
+        "energy_kwh": dict(
+            zip(SOURCE_NAMES, (totals.sum(axis=1) * slot_hours).tolist())
+        ),
+        "peak_power_kw": float(charging.max()),
+        "peak_time_hours": float(charging.argmax() * slot_hours),
+        "violations": report["counts"],
+        "num_invalid": report["num_invalid"],
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate, aggregate, validate and export EV charging fleets"
+    )
+    parser.add_argument("-n", "--vehicles", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--resolution", type=int, default=RESOLUTION, help="slot length in minutes"
+    )
+    parser.add_argument(
+        "--horizon", type=int, default=TIME_PERIOD, help="time period in hours"
+    )
+    parser.add_argument("-j", "--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("-f", "--format", choices=FORMATS, default="csv")
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="output file (directory for memmap); summary only if omitted",
+    )
+    parser.add_argument(
+        "--archetypes",
+        type=int,
+        default=None,
+        metavar="K",
+        help=(
+            "export K archetypes (and vehicle labels) instead of every vehicle; "
+            "csv, npy and json formats only"
+        ),
+    )
+    parser.add_argument("--no-validate", action="store_true")
+    parser.add_argument("-q", "--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    for name in ("vehicles", "chunk_size", "horizon", "workers", "archetypes"):
+        value = getattr(args, name)
+        if value is not None and value < 1:
+            parser.error(f"--{name.replace('_', '-')} must be at least 1")
+    # Mobility needs are smoothed over SMOOTHING_WINDOW hours
+    if args.horizon < SMOOTHING_WINDOW:
+        parser.error(f"--horizon must be at least {SMOOTHING_WINDOW} hours")
+    if args.resolution < 1 or 60 % args.resolution:
+        parser.error("--resolution must divide 60 minutes")
+    if args.format == "memmap" and args.output is None:
+        parser.error("--format memmap needs an --output directory")
+    if args.format == "memmap" and args.archetypes is not None:
+        parser.error("--archetypes cannot be exported with --format memmap")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    timings = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        path = args.output if args.format == "memmap" else scratch
+
+        started = time.perf_counter()
+        store = generate_store(
+            path,
+            args.vehicles,
+            args.seed,
+            args.chunk_size,
+            args.horizon,
+            args.resolution,
+            args.workers,
+            args.quiet,
+        )
+        timings["generate"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        totals = aggregate_store(store, args.chunk_size)
+        timings["aggregate"] = time.perf_counter() - started
+
+        report = {"counts": {}, "num_invalid": None}
+        if not args.no_validate:
+            started = time.perf_counter()
+            report = validate_store(store, args.chunk_size)
+            timings["validate"] = time.perf_counter() - started
+
+        summary = summarize(store, totals, report)
+        archetypes = None
+        if args.archetypes:
+            started = time.perf_counter()
+            archetypes = fit_store_archetypes(
+                store, args.archetypes, args.seed, chunk_size=args.chunk_size
+            )
+            timings["cluster"] = time.perf_counter() - started
+            summary["archetypes"] = {
+                "counts": archetypes["counts"].tolist(),
+                "max_error": archetypes["max_error"].tolist(),
+                "rms_error": archetypes["rms_error"].tolist(),
+            }
+
+        started = time.perf_counter()
+        if args.output is not None:
+            export(
+                store, archetypes, summary, args.output, args.format, args.chunk_size
+            )
+        timings["export"] = time.perf_counter() - started
+        del store
+
+    summary["timings_s"] = {stage: round(t, 4) for stage, t in timings.items()}
+    print(json.dumps(summary, indent=2))
+    if not args.quiet:
+        for stage, seconds in timings.items():
+            print(f"{stage:>10}: {seconds:8.3f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
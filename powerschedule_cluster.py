@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+
+from powerschedule_fleet import (
+    CHUNK_SIZE,
+    RESOLUTION,
+    SOURCE_NAMES,
+    time_axis,
+)
+
+NUM_ARCHETYPES = 16  # Default number of archetypes (K)
+BATCH_SIZE = 1024  # Mini-batch size for k-means
+MAX_ITERATIONS = 200  # Mini-batches drawn while fitting
+SAMPLE_SIZE = 50_000  # Vehicles sampled from a store to fit the archetypes
+
+
+# Flatten a fleet block (vehicles, sources, slots) into feature rows
+def _features(block):
+    return np.asarray(block, dtype=np.float32).reshape(len(block), -1)
+
+
+# Nearest center of every row, with the squared distance to it
+def _nearest(features, centers):
+    distances = (
+        (features * features).sum(axis=1)[:, None]
+        - 2 * features @ centers.T
+        + (centers * centers).sum(axis=1)[None, :]
+    )
+    labels = distances.argmin(axis=1)
+    return labels, np.maximum(distances[np.arange(len(labels)), labels], 0)
+
+
+# k-means++ seeding: each new center is drawn with probability proportional
+# to its squared distance to the centers picked so far
+def _seed_centers(features, k, rng):
+    centers = [features[rng.integers(len(features))]]
+    distances = ((features - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = distances.sum()
+        if total == 0:
+            break
+        centers.append(features[rng.choice(len(features), p=distances / total)])
+        distances = np.minimum(distances, ((features - centers[-1]) ** 2).sum(axis=1))
+    return np.array(centers)
+
+
+# Mini-batch k-means (Sculley, 2010) over in-memory feature rows
+def minibatch_kmeans(
+    features,
+    k=NUM_ARCHETYPES,
+    batch_size=BATCH_SIZE,
+    max_iterations=MAX_ITERATIONS,
+    rng=None,
+):
+    rng = np.random.default_rng(rng)
+    seed_rows = rng.choice(len(features), min(len(features), 10 * k), replace=False)
+    centers = _seed_centers(features[seed_rows], k, rng).astype(np.float64)
+    seen = np.zeros(len(centers))
+    for _ in range(max_iterations):
+        batch = features[rng.integers(len(features), size=batch_size)]
+        labels, _ = _nearest(batch, centers.astype(np.float32))
+        members = labels == np.arange(len(centers))[:, None]
+        batch_counts = members.sum(axis=1)
+        batch_sums = members.astype(np.float32) @ batch
+        # Per-center learning rate 1 / (points seen), applied to the batch mean
+        seen += batch_counts
+        hit = batch_counts > 0
+        centers[hit] += (
+            batch_sums[hit] - batch_counts[hit, None] * centers[hit]
+        ) / seen[hit, None]
+    return centers.astype(np.float32)
+
+
+# Accumulate counts and error bounds of the archetypes over fleet chunks.
+# max_error bounds |vehicle - archetype| over every slot of every member;
+# rms_error is the mean per-vehicle RMS deviation.
+def _assign_chunks(chunks, centers):
+    k = len(centers)
+    counts = np.zeros(k, dtype=np.int64)
+    max_error = np.zeros(k)
+    rms_sum = np.zeros(k)
+    labels = []
+    for _, block in chunks:
+        features = _features(block)
+        chunk_labels, squared = _nearest(features, centers)
+        deviation = np.abs(features - centers[chunk_labels]).max(axis=1)
+        counts += np.bincount(chunk_labels, minlength=k)
+        np.maximum.at(max_error, chunk_labels, deviation)
+        rms_sum += np.bincount(
+            chunk_labels, weights=np.sqrt(squared / features.shape[1]), minlength=k
+        )
+        labels.append(chunk_labels)
+    return np.concatenate(labels), counts, max_error, rms_sum
+
+
+# Package the archetypes, dropping empty ones and renumbering the labels
+def _archetypes(centers, shape, assigned, sources, resolution):
+    labels, counts, max_error, rms_sum = assigned
+    keep = np.flatnonzero(counts)
+    renumber = np.full(len(counts), -1)
+    renumber[keep] = np.arange(len(keep))
+    return {
+        "centers": centers[keep].reshape(len(keep), *shape),
+        "counts": counts[keep],
+        "labels": renumber[labels],
+        "max_error": max_error[keep],
+        "rms_error": rms_sum[keep] / counts[keep],
+        "sources": list(sources),
+        "resolution": resolution,
+    }
+
+
+# Group the vehicles of an in-memory fleet block into K archetypes
+def fit_archetypes(
+    block,
+    k=NUM_ARCHETYPES,
+    rng=None,
+    sources=SOURCE_NAMES,
+    resolution=RESOLUTION,
+    chunk_size=CHUNK_SIZE,
+    **kwargs,
+):
+    centers = minibatch_kmeans(_features(block), k, rng=rng, **kwargs)
+    chunks = (
+        (start, block[start : start + chunk_size])
+        for start in range(0, len(block), chunk_size)
+    )
+    assigned = _assign_chunks(chunks, centers)
+    return _archetypes(centers, block.shape[1:], assigned, sources, resolution)
+
+
+# Group the vehicles of a FleetStore into K archetypes: fit on a random
+# sample, then assign every vehicle chunk by chunk
+def fit_store_archetypes(
+    store,
+    k=NUM_ARCHETYPES,
+    rng=None,
+    sample_size=SAMPLE_SIZE,
+    chunk_size=CHUNK_SIZE,
+    **kwargs,
+):
+    rng = np.random.default_rng(rng)
+    sample = np.sort(
+        rng.choice(
+            store.num_vehicles, min(sample_size, store.num_vehicles), replace=False
+        )
+    )
+    centers = minibatch_kmeans(_features(store.data[sample]), k, rng=rng, **kwargs)
+    assigned = _assign_chunks(store.iter_chunks(chunk_size), centers)
+    return _archetypes(
+        centers, store.shape[1:], assigned, store.sources, store.resolution
+    )
+
+
+# Long-format DataFrame of the archetypes, in the same columns as the
+# dashboards plus the archetype id, its vehicle count and error bound
+def archetypes_to_dataframe(archetypes):
+    centers = archetypes["centers"]
+    k, num_sources, num_slots = centers.shape
+    per_archetype = num_sources * num_slots
+    return pd.DataFrame(
+        {
+            "Archetype": np.repeat(np.arange(k), per_archetype),
+            "Count": np.repeat(archetypes["counts"], per_archetype),
+            "Max Error (kWh)": np.repeat(archetypes["max_error"], per_archetype),
+            "Time (Hours)": np.tile(
+                time_axis(num_slots, archetypes["resolution"]), k * num_sources
+            ),
+            "Power Schedule (kWh)": centers.reshape(-1),
+            "Profile": np.tile(np.repeat(archetypes["sources"], num_slots), k),
+        }
+    )
+
+
+# Export the archetypes as CSV, and optionally the vehicle -> archetype labels
+def export_archetypes(archetypes, path, labels_path=None):
+    archetypes_to_dataframe(archetypes).to_csv(path, index=False)
+    if labels_path is not None:
+        np.save(labels_path, archetypes["labels"].astype(np.int32))
@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+
+from powerschedule_smoothing import smooth_mobility_needs
+
+# Constants
+TIME_PERIOD = 24  # 24 hours for a full day
+POWER_MAX = 50  # Maximum power in kWh for any step
+POWER_MIN = 5  # Minimum power in kWh for any step
+STEP_MIN_DURATION = 1  # Minimum duration for a step (in hours)
+STEP_MAX_DURATION = 6  # Maximum duration for a step (in hours)
+RESOLUTION = 60  # Slot length (in minutes)
+LOW_POWER_FRACTION = 0.3  # Off-window power upper bound (fraction of POWER_MAX)
+CHUNK_SIZE = 10_000  # Vehicles generated/processed at once
+
+# Priority windows (in hours) and the lower bound of the in-window power draw,
+# as a fraction of POWER_MAX, for each charging source
+PRIORITY_WINDOWS = {
+    "Grid Energy": {"windows": [(18, 24), (0, 6)], "high_fraction": 0.7},
+    "Solar Power": {"windows": [(10, 16)], "high_fraction": 0.6},
+    "Surplus Solar": {"windows": [(12, 14)], "high_fraction": 0.8},
+}
+PROFILE_NAMES = list(PRIORITY_WINDOWS)
+MOBILITY_NEEDS = "Mobility Needs"
+SOURCE_NAMES = PROFILE_NAMES + [MOBILITY_NEEDS]
+
+
+# Number of slots per hour for a slot length in minutes
+def slots_per_hour(resolution=RESOLUTION):
+    if resolution <= 0 or 60 % resolution:
+        raise ValueError(f"resolution must divide 60 minutes, got {resolution}")
+    return 60 // resolution
+
+
+# Boolean (profiles, hours) mask of the priority windows
+def priority_window_mask(time_period=TIME_PERIOD, priority_windows=PRIORITY_WINDOWS):
+    hours = np.arange(time_period) % 24
+    mask = np.zeros((len(priority_windows), time_period), dtype=bool)
+    for i, settings in enumerate(priority_windows.values()):
+        for start, end in settings["windows"]:
+            mask[i] |= (start <= hours) & (hours < end)
+    return mask
+
+
+# Draw all the random numbers needed for a batch of vehicles. Levels and
+# schedules are derived from these by build_fleet, so the draws can be kept
+# and rescaled when the power bounds change.
+def draw_fleet(num_vehicles, rng=None, time_period=TIME_PERIOD):
+    rng = np.random.default_rng(rng)
+    num_profiles = len(PROFILE_NAMES)
+
+    # Random step durations that sum up to time_period (at most one step per hour)
+    durations = rng.integers(
+        STEP_MIN_DURATION,
+        STEP_MAX_DURATION + 1,
+        size=(num_vehicles, num_profiles, time_period),
+    )
+    starts = np.cumsum(durations, axis=-1) - durations
+    step_starts = np.zeros((num_vehicles, num_profiles, time_period + 1), dtype=bool)
+    np.put_along_axis(step_starts, np.minimum(starts, time_period), True, axis=-1)
+
+    return {
+        "step_starts": step_starts[..., :time_period],
+        "level_draws": rng.random((num_vehicles, num_profiles, time_period)),
+        "mobility_draws": rng.standard_normal((num_vehicles, time_period)),
+    }
+
+
+# Per-hour power levels (vehicles, profiles, hours) from the uniform draws,
+# with one profile per entry of priority_windows
+def build_power_levels(
+    level_draws,
+    power_min=POWER_MIN,
+    power_max=POWER_MAX,
+    priority_windows=PRIORITY_WINDOWS,
+):
+    in_window = priority_window_mask(level_draws.shape[-1], priority_windows)
+    high_fraction = np.array(
+        [settings["high_fraction"] for settings in priority_windows.values()]
+    )[:, None]
+    low = np.where(in_window, power_max * high_fraction, power_min)
+    high = np.where(in_window, power_max, power_max * LOW_POWER_FRACTION)
+    return low + level_draws * (high - low)
+
+
+# Step schedules (vehicles, profiles, hours): each step holds the level drawn
+# at its starting hour
+def build_step_schedules(step_starts, power_levels):
+    hours = np.arange(step_starts.shape[-1])
+    step_index = np.maximum.accumulate(np.where(step_starts, hours, 0), axis=-1)
+    return np.take_along_axis(power_levels, step_index, axis=-1)
+
+
+# Smoothed mobility needs (vehicles, hours) from the standard normal draws
+def build_mobility_needs(mobility_draws, power_min=POWER_MIN, power_max=POWER_MAX):
+    hours = np.arange(mobility_draws.shape[-1]) % 24
+    peak = ((7 <= hours) & (hours < 9)) | ((17 <= hours) & (hours < 19))
+    night = hours < 6
+    loc = np.where(peak, power_max * 0.8, np.where(night, power_min, power_max * 0.4))
+    scale = np.where(
+        peak, power_max * 0.1, np.where(night, power_min * 0.5, power_max * 0.2)
+    )
+    mobility_needs = np.clip(loc + scale * mobility_draws, power_min, power_max)
+    return smooth_mobility_needs(mobility_needs)
+
+
+# Fleet matrix (vehicles, sources, slots) from hourly schedules and needs
+def assemble_fleet(schedules, mobility_needs, resolution=RESOLUTION, dtype=np.float32):
+    fleet = np.concatenate([schedules, mobility_needs[:, None, :]], axis=1)
+    return np.repeat(
+        fleet.astype(dtype, copy=False), slots_per_hour(resolution), axis=-1
+    )
+
+
+# Build the fleet matrix (vehicles, sources, slots) from a set of draws
+def build_fleet(
+    draws,
+    power_min=POWER_MIN,
+    power_max=POWER_MAX,
+    resolution=RESOLUTION,
+    dtype=np.float32,
+):
+    power_levels = build_power_levels(draws["level_draws"], power_min, power_max)
+    schedules = build_step_schedules(draws["step_starts"], power_levels)
+    mobility_needs = build_mobility_needs(draws["mobility_draws"], power_min, power_max)
+    return assemble_fleet(schedules, mobility_needs, resolution, dtype)
+
+
+# Generate the charging profiles and mobility needs of a batch of vehicles
+def generate_fleet(
+    num_vehicles,
+    rng=None,
+    time_period=TIME_PERIOD,
+    resolution=RESOLUTION,
+    power_min=POWER_MIN,
+    power_max=POWER_MAX,
+    dtype=np.float32,
+):
+    draws = draw_fleet(num_vehicles, rng, time_period)
+    return build_fleet(draws, power_min, power_max, resolution, dtype)
+
+
+# Generate a fleet chunk by chunk, yielding (first vehicle index, block).
+# Each chunk gets its own child seed, so the output depends on seed and
+# chunk_size but not on how the chunks are consumed. chunks restricts the
+# generation to a range of chunk indices, e.g. one shard of a larger fleet.
+def iter_fleet_chunks(
+    num_vehicles, chunk_size=CHUNK_SIZE, seed=None, chunks=None, **kwargs
+):
+    num_chunks = -(-num_vehicles // chunk_size)
+    child_seeds = np.random.SeedSequence(seed).spawn(num_chunks)
+    for i in range(num_chunks) if chunks is None else chunks:
+        start = i * chunk_size
+        count = min(chunk_size, num_vehicles - start)
+        rng = np.random.default_rng(child_seeds[i])
+        yield start, generate_fleet(count, rng, **kwargs)
+
+
+# Time axis (in hours) of the slots
+def time_axis(num_slots, resolution=RESOLUTION):
+    return np.arange(num_slots) / slots_per_hour(resolution)
+
+
+# Long-format DataFrame of a fleet block, in the same columns as the dashboards
+def fleet_to_dataframe(block, start=0, sources=SOURCE_NAMES, resolution=RESOLUTION):
+    num_vehicles, num_sources, num_slots = block.shape
+    return pd.DataFrame(
+        {
+            "Vehicle": np.repeat(
+                np.arange(start, start + num_vehicles), num_sources * num_slots
+            ),
+            "Time (Hours)": np.tile(
+                time_axis(num_slots, resolution), num_vehicles * num_sources
+            ),
+            "Power Schedule (kWh)": block.reshape(-1),
+            "Profile": np.tile(np.repeat(sources, num_slots), num_vehicles),
+        }
+    )
+
+
+# Long-format DataFrame of per-slot fleet totals (sources, slots)
+def totals_to_dataframe(totals, sources=SOURCE_NAMES, resolution=RESOLUTION):
+    num_sources, num_slots = totals.shape
+    return pd.DataFrame(
+        {
+            "Time (Hours)": np.tile(time_axis(num_slots, resolution), num_sources),
+            "Power Schedule (kWh)": totals.reshape(-1),
+            "Profile": np.repeat(sources, num_slots),
+        }
+    )
@@ -0,0 +1,58 @@
+import numpy as np
+
+from powerschedule_fleet import PROFILE_NAMES
+
+MAX_ROWS = 1000  # Heatmap rows sent to the browser (about one per pixel)
+ROW_ORDERS = ["Peak Hour", "Total Energy", "Vehicle"]
+ROW_AGGREGATES = ["Mean", "Max"]
+ALL_CHARGING = "All Charging"
+
+
+# Vehicle x slot power matrix of one source, or of all charging sources
+def power_matrix(block, source=ALL_CHARGING, sources=PROFILE_NAMES):
+    if source == ALL_CHARGING:
+        return block[:, : len(PROFILE_NAMES)].sum(axis=1)
+    return np.asarray(block[:, list(sources).index(source)])
+
+
+# Row order of a vehicle x slot matrix: by the slot of each vehicle's peak
+# (ties broken by peak height), by total energy, or by vehicle index
+def row_order(matrix, order="Peak Hour"):
+    if order == "Peak Hour":
+        return np.lexsort((-matrix.max(axis=1), matrix.argmax(axis=1)))
+    if order == "Total Energy":
+        return np.argsort(-matrix.sum(axis=1), kind="stable")
+    if order == "Vehicle":
+        return np.arange(len(matrix))
+    raise ValueError(f"unknown row order {order!r}, expected one of {ROW_ORDERS}")
+
+
+# Bin consecutive rows so at most max_rows remain, returning the binned
+# matrix and the (first, last) row of each bin
+def bin_rows(matrix, max_rows=MAX_ROWS, aggregate="Mean"):
+    num_rows = len(matrix)
+    num_bins = min(max_rows, num_rows)
+    edges = np.linspace(0, num_rows, num_bins + 1).astype(int)
+    starts = edges[:-1]
+    if aggregate == "Mean":
+        binned = np.add.reduceat(matrix, starts, axis=0, dtype=np.float64)
+        binned /= np.diff(edges)[:, None]
+    elif aggregate == "Max":
+        binned = np.maximum.reduceat(matrix, starts, axis=0)
+    else:
+        raise ValueError(
+            f"unknown aggregate {aggregate!r}, expected one of {ROW_AGGREGATES}"
+        )
+    return binned, np.stack([starts, edges[1:] - 1], axis=1)
+
+
+# Ordered and binned heatmap rows of a vehicle x slot matrix, labelled with
+# the ranks they cover in that order (not vehicle indices, unless the order
+# is "Vehicle")
+def heatmap_rows(matrix, order="Peak Hour", aggregate="Mean", max_rows=MAX_ROWS):
+    binned, bounds = bin_rows(matrix[row_order(matrix, order)], max_rows, aggregate)
+    labels = [
+        f"rank {first}" if first == last else f"rank {first}-{last}"
+        for first, last in bounds
+    ]
+    return binned, labels
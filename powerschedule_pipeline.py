@@ -0,0 +1,170 @@
+import copy
+from functools import partial
+
+import numpy as np
+
+from powerschedule_fleet import (
+    POWER_MAX,
+    POWER_MIN,
+    PRIORITY_WINDOWS,
+    PROFILE_NAMES,
+    RESOLUTION,
+    TIME_PERIOD,
+    assemble_fleet,
+    build_mobility_needs,
+    build_power_levels,
+    build_step_schedules,
+    draw_fleet,
+)
+
+# Default generation parameters of fleet_pipeline
+DEFAULT_PARAMS = {
+    "num_vehicles": 1000,
+    "seed": None,
+    "time_period": TIME_PERIOD,
+    "resolution": RESOLUTION,
+    "power_min": POWER_MIN,
+    "power_max": POWER_MAX,
+}
+
+
+# Small dependency graph over the generation stages. Each stage names the
+# parameters and upstream stages it reads; its result is cached until one
+# of those changes, so a parameter change only recomputes what it affects.
+# params is a tuple of parameter names, or a {keyword: parameter} mapping
+# when the stage function calls the parameter something else.
+class Pipeline:
+    def __init__(self, **params):
+        self.params = {}
+        self.stages = {}
+        self.cache = {}
+        self.recomputed = []  # Stages computed since the last set()/reset
+        self.set(**params)
+
+    def add_stage(self, name, func, params=(), inputs=()):
+        if not isinstance(params, dict):
+            params = {param: param for param in params}
+        self.stages[name] = {"func": func, "params": params, "inputs": inputs}
+        self.invalidate(name)
+
+    # Update parameters (as keywords, or a mapping for names that are not
+    # identifiers) and drop the cached stages that depend on them
+    def set(self, changes=None, **params):
+        params = {**(changes or {}), **params}
+        changed = [
+            name
+            for name, value in params.items()
+            if name not in self.params or not _equal(self.params[name], value)
+        ]
+        self.params.update(copy.deepcopy(params))
+        for name, stage in self.stages.items():
+            if any(param in stage["params"].values() for param in changed):
+                self.invalidate(name)
+        self.recomputed = []
+        return changed
+
+    # Drop a stage and everything downstream of it
+    def invalidate(self, name):
+        self.cache.pop(name, None)
+        for other, stage in self.stages.items():
+            if name in stage["inputs"] and other in self.cache:
+                self.invalidate(other)
+
+    def get(self, name):
+        if name not in self.cache:
+            stage = self.stages[name]
+            inputs = [self.get(upstream) for upstream in stage["inputs"]]
+            params = {
+                keyword: self.params[param]
+                for keyword, param in stage["params"].items()
+            }
+            self.cache[name] = stage["func"](*inputs, **params)
+            self.recomputed.append(name)
+        return self.cache[name]
+
+
+def _equal(a, b):
+    try:
+        return bool(a == b)
+    except ValueError:
+        return np.array_equal(a, b)
+
+
+# Per-profile priority window parameters, so that changing one profile's
+# settings only invalidates that profile's stages
+def priority_window_params(priority_windows=PRIORITY_WINDOWS):
+    return {f"priority_window:{name}": priority_windows[name] for name in PROFILE_NAMES}
+
+
+def _draws(num_vehicles, seed, time_period):
+    return draw_fleet(num_vehicles, seed, time_period)
+
+
+# Power levels of one profile, rescaled from the cached uniform draws
+def _profile_levels(draws, index, name, power_min, power_max, priority_window):
+    return build_power_levels(
+        draws["level_draws"][:, index : index + 1],
+        power_min,
+        power_max,
+        {name: priority_window},
+    )
+
+
+def _profile_schedule(draws, levels, index):
+    return build_step_schedules(draws["step_starts"][:, index : index + 1], levels)
+
+
+def _mobility_needs(draws, power_min, power_max):
+    return build_mobility_needs(draws["mobility_draws"], power_min, power_max)
+
+
+def _fleet(mobility_needs, *schedules, resolution):
+    return assemble_fleet(np.concatenate(schedules, axis=1), mobility_needs, resolution)
+
+
+def _aggregates(fleet):
+    return fleet.sum(axis=0, dtype=np.float64)
+
+
+# Pipeline of the fleet generation: random draws -> per-profile levels ->
+# per-profile schedules -> fleet matrix -> aggregates. Changing power_max
+# rescales the cached draws without resampling; changing one profile's
+# priority window (see priority_window_params) only rebuilds that profile.
+# Stages such as figures can be added on top with
+# add_stage(..., inputs=("aggregates",)).
+def fleet_pipeline(priority_windows=PRIORITY_WINDOWS, **params):
+    pipeline = Pipeline(**{**DEFAULT_PARAMS, **params})
+    pipeline.set(priority_window_params(priority_windows))
+    pipeline.add_stage("draws", _draws, params=("num_vehicles", "seed", "time_period"))
+    schedules = []
+    for index, name in enumerate(PROFILE_NAMES):
+        pipeline.add_stage(
+            f"levels:{name}",
+            partial(_profile_levels, index=index, name=name),
+            params={
+                "power_min": "power_min",
+                "power_max": "power_max",
+                "priority_window": f"priority_window:{name}",
+            },
+            inputs=("draws",),
+        )
+        pipeline.add_stage(
+            f"schedule:{name}",
+            partial(_profile_schedule, index=index),
+            inputs=("draws", f"levels:{name}"),
+        )
+        schedules.append(f"schedule:{name}")
+    pipeline.add_stage(
+        "mobility_needs",
+        _mobility_needs,
+        params=("power_min", "power_max"),
+        inputs=("draws",),
+    )
+    pipeline.add_stage(
+        "fleet",
+        _fleet,
+        params=("resolution",),
+        inputs=("mobility_needs", *schedules),
+    )
+    pipeline.add_stage("aggregates", _aggregates, inputs=("fleet",))
+    return pipeline
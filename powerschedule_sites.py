@@ -0,0 +1,283 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from powerschedule_fleet import (
+    CHUNK_SIZE,
+    POWER_MAX,
+    POWER_MIN,
+    PROFILE_NAMES,
+    RESOLUTION,
+    TIME_PERIOD,
+    iter_fleet_chunks,
+    slots_per_hour,
+)
+from powerschedule_smoothing import SMOOTHING_WINDOW
+
+SHARD_SIZE = 100_000  # Vehicles per shard (rounded up to whole chunks)
+CHECKPOINT_DIR = "checkpoints"
+# Fixed log-spaced bin edges shared by every shard, so the per-vehicle
+# histograms can be merged by adding counts (~2.3% relative bin width)
+SKETCH_EDGES = np.concatenate([[0.0], np.geomspace(1.0, 1e6, 600)])
+
+
+# Read a site manifest: a JSON list of sites (or {"sites": [...]}) with
+# site, num_vehicles and optionally seed, profile_mix (per-source weights),
+# power_min, power_max, power_limit (site connection limit), time_period
+# and resolution
+def load_manifest(path):
+    with open(path) as f:
+        manifest = json.load(f)
+    sites = manifest["sites"] if isinstance(manifest, dict) else manifest
+    names = [site["site"] for site in sites]
+    if len(set(names)) != len(names):
+        raise ValueError("site names in the manifest must be unique")
+    # Names are used as checkpoint file names
+    for name in names:
+        if (
+            not isinstance(name, str)
+            or name in ("", ".", "..")
+            or any(sep and sep in name for sep in ("/", os.sep, os.altsep))
+        ):
+            raise ValueError(f"invalid site name {name!r}: must be a file name")
+    if any(site["num_vehicles"] <= 0 for site in sites):
+        raise ValueError("every site needs a positive num_vehicles")
+    # Mobility needs are smoothed over SMOOTHING_WINDOW hours
+    if any(site.get("time_period", TIME_PERIOD) < SMOOTHING_WINDOW for site in sites):
+        raise ValueError(f"time_period must be at least {SMOOTHING_WINDOW} hours")
+    resolutions = [site.get("resolution", RESOLUTION) for site in sites]
+    if any(resolution < 1 or 60 % resolution for resolution in resolutions):
+        raise ValueError("resolution must divide 60 minutes")
+    return sites
+
+
+# Split the sites into (site index, chunk range) shards of whole chunks
+def plan_shards(sites, shard_size=SHARD_SIZE, chunk_size=CHUNK_SIZE):
+    chunks_per_shard = max(1, shard_size // chunk_size)
+    shards = []
+    for site_index, site in enumerate(sites):
+        num_chunks = -(-site["num_vehicles"] // chunk_size)
+        for first in range(0, num_chunks, chunks_per_shard):
+            shards.append(
+                (site_index, range(first, min(first + chunks_per_shard, num_chunks)))
+            )
+    return shards
+
+
+def shard_checkpoint_path(checkpoint_dir, site, chunks):
+    return os.path.join(checkpoint_dir, f"{site['site']}-{chunks.start:06d}.json")
+
+
+# Everything a shard summary depends on: a checkpoint is only reused when
+# the manifest entry and run settings still match
+def shard_key(site, chunks, chunk_size, seed, site_index):
+    return {
+        "site": site,
+        "chunks": [chunks.start, chunks.stop],
+        "chunk_size": chunk_size,
+        "seed": seed,
+        "site_index": site_index,
+    }
+
+
+def _histogram(values):
+    return np.histogram(np.clip(values, 0, SKETCH_EDGES[-1]), SKETCH_EDGES)[0]
+
+
+# Map step: generate one shard of a site and summarize it
+def summarize_shard(site, chunks, chunk_size=CHUNK_SIZE, seed=0, site_index=0):
+    resolution = site.get("resolution", RESOLUTION)
+    time_period = site.get("time_period", TIME_PERIOD)
+    mix = site.get("profile_mix", {})
+    weights = np.array([mix.get(name, 1.0) for name in PROFILE_NAMES])[:, None]
+    slot_hours = 1 / slots_per_hour(resolution)
+
+    num_slots = time_period * slots_per_hour(resolution)
+    totals = np.zeros((len(PROFILE_NAMES), num_slots))
+    needs = np.zeros(num_slots)
+    energy_hist = np.zeros(len(SKETCH_EDGES) - 1, dtype=np.int64)
+    peak_hist = np.zeros_like(energy_hist)
+    num_vehicles = 0
+    for _, block in iter_fleet_chunks(
+        site["num_vehicles"],
+        chunk_size,
+        site.get("seed", [seed, site_index]),
+        chunks=chunks,
+        time_period=time_period,
+        resolution=resolution,
+        power_min=site.get("power_min", POWER_MIN),
+        power_max=site.get("power_max", POWER_MAX),
+    ):
+        charging = block[:, : len(PROFILE_NAMES)] * weights
+        vehicle_power = charging.sum(axis=1)
+        totals += charging.sum(axis=0, dtype=np.float64)
+        needs += block[:, len(PROFILE_NAMES)].sum(axis=0, dtype=np.float64)
+        energy_hist += _histogram(vehicle_power.sum(axis=1) * slot_hours)
+        peak_hist += _histogram(vehicle_power.max(axis=1))
+        num_vehicles += len(block)
+
+    return {
+        "site": site["site"],
+        "num_vehicles": num_vehicles,
+        "resolution": resolution,
+        "totals": totals.tolist(),
+        "mobility_needs": needs.tolist(),
+        "energy_hist": energy_hist.tolist(),
+        "peak_hist": peak_hist.tolist(),
+    }
+
+
+# Worker entry point: summarize a shard and checkpoint it atomically
+def run_shard(
+    site, chunks, checkpoint_dir, chunk_size=CHUNK_SIZE, seed=0, site_index=0
+):
+    summary = summarize_shard(site, chunks, chunk_size, seed, site_index)
+    summary["key"] = shard_key(site, chunks, chunk_size, seed, site_index)
+    path = shard_checkpoint_path(checkpoint_dir, site, chunks)
+    with open(path + ".tmp", "w") as f:
+        json.dump(summary, f)
+    os.replace(path + ".tmp", path)
+    return summary
+
+
+# Reduce step: add up shard (or site) summaries
+def merge_summaries(summaries, site=None):
+    summaries = list(summaries)
+    merged = {
+        "site": site,
+        "num_vehicles": sum(s["num_vehicles"] for s in summaries),
+        "resolution": summaries[0]["resolution"],
+    }
+    for key in ["totals", "mobility_needs", "energy_hist", "peak_hist"]:
+        merged[key] = np.sum([s[key] for s in summaries], axis=0).tolist()
+    return merged
+
+
+# Percentile from histogram counts, interpolated linearly inside the bin
+def sketch_percentile(counts, q):
+    counts = np.asarray(counts)
+    cumulative = np.cumsum(counts)
+    if cumulative[-1] == 0:
+        return float("nan")
+    rank = q / 100 * cumulative[-1]
+    i = min(int(np.searchsorted(cumulative, rank)), len(counts) - 1)
+    below = cumulative[i] - counts[i]
+    fraction = (rank - below) / counts[i] if counts[i] else 0.0
+    return float(SKETCH_EDGES[i] + fraction * (SKETCH_EDGES[i + 1] - SKETCH_EDGES[i]))
+
+
+# Headline figures of a merged summary
+def describe_summary(summary, power_limit=None):
+    totals = np.asarray(summary["totals"])
+    charging = totals.sum(axis=0)
+    slot_hours = 1 / slots_per_hour(summary["resolution"])
+    report = {
+        "site": summary["site"],
+        "num_vehicles": summary["num_vehicles"],
+        "energy_kwh": dict(
+            zip(PROFILE_NAMES, (totals.sum(axis=1) * slot_hours).tolist())
+        ),
+        "peak_power_kw": float(charging.max()),
+        "peak_slot": int(charging.argmax()),
+        "vehicle_energy_p50": sketch_percentile(summary["energy_hist"], 50),
+        "vehicle_energy_p95": sketch_percentile(summary["energy_hist"], 95),
+        "vehicle_peak_p95": sketch_percentile(summary["peak_hist"], 95),
+    }
+    if power_limit is not None:
+        report["slots_over_limit"] = int((charging > power_limit).sum())
+    return report
+
+
+# Run every site of a manifest over a process pool. Finished shards are
+# read back from checkpoint_dir, so a crashed run only redoes missing shards.
+def run_sites(
+    sites,
+    checkpoint_dir=CHECKPOINT_DIR,
+    workers=None,
+    chunk_size=CHUNK_SIZE,
+    shard_size=SHARD_SIZE,
+    seed=0,
+):
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    shard_summaries = {site["site"]: [] for site in sites}
+    pending = []
+    for site_index, chunks in plan_shards(sites, shard_size, chunk_size):
+        site = sites[site_index]
+        path = shard_checkpoint_path(checkpoint_dir, site, chunks)
+        key = shard_key(site, chunks, chunk_size, seed, site_index)
+        if os.path.exists(path):
+            with open(path) as f:
+                summary = json.load(f)
+            if summary.get("key") == key:
+                shard_summaries[site["site"]].append(summary)
+                continue
+        pending.append((site_index, chunks))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(
+                run_shard,
+                sites[site_index],
+                chunks,
+                checkpoint_dir,
+                chunk_size,
+                seed,
+                site_index,
+            ): site_index
+            for site_index, chunks in pending
+        }
+        for future in as_completed(futures):
+            summary = future.result()
+            shard_summaries[summary["site"]].append(summary)
+
+    site_summaries = {
+        name: merge_summaries(summaries, name)
+        for name, summaries in shard_summaries.items()
+    }
+    reports = [
+        describe_summary(site_summaries[site["site"]], site.get("power_limit"))
+        for site in sites
+    ]
+
+    # Sites with different horizons/resolutions cannot share a slot axis
+    same_axis = len({len(s["mobility_needs"]) for s in site_summaries.values()}) == 1
+    same_axis &= len({s["resolution"] for s in site_summaries.values()}) == 1
+    overall = None
+    if same_axis:
+        overall = describe_summary(merge_summaries(site_summaries.values(), "all"))
+    return {"sites": reports, "overall": overall, "shards_run": len(pending)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a multi-site manifest")
+    parser.add_argument("manifest", help="JSON site manifest")
+    parser.add_argument("--checkpoint-dir", default=CHECKPOINT_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    try:
+        sites = load_manifest(args.manifest)
+    except ValueError as e:
+        parser.error(f"{args.manifest}: {e}")
+
+    started = time.perf_counter()
+    result = run_sites(
+        sites,
+        args.checkpoint_dir,
+        args.workers,
+        args.chunk_size,
+        args.shard_size,
+        args.seed,
+    )
+    print(json.dumps(result, indent=2))
+    print(
+        f"{result['shards_run']} shards run in {time.perf_counter() - started:.1f}s",
+        file=sys.stderr,
+    )
@@ -0,0 +1,108 @@
+import numpy as np
+from scipy.signal import lfilter, savgol_coeffs, savgol_filter
+
+# Smoothing settings used by generate_mobility_needs_profile
+SMOOTHING_WINDOW = 5  # Savitzky-Golay window length (in samples)
+SMOOTHING_POLYORDER = 3  # Savitzky-Golay polynomial order
+SMOOTHING_TOLERANCE = 1e-9  # Max abs error vs. savgol_filter on finalized data
+
+
+# Incremental Savitzky-Golay smoother for a batch of vehicles.
+#
+# savgol_filter is centred: the value at hour t needs the samples up to
+# t + window // 2. This smoother runs the same FIR coefficients through lfilter
+# with a carried zi, so each update costs O(new samples) and emits the values
+# whose window is complete ("finalized history"). Those values match
+# savgol_filter(mode="interp") on the full series within SMOOTHING_TOLERANCE;
+# the last window // 2 values are only available through provisional().
+class StreamingSavgolSmoother:
+    def __init__(
+        self,
+        num_vehicles=1,
+        window_length=SMOOTHING_WINDOW,
+        polyorder=SMOOTHING_POLYORDER,
+    ):
+        if window_length % 2 == 0 or window_length <= polyorder:
+            raise ValueError("window_length must be odd and greater than polyorder")
+        self.num_vehicles = num_vehicles
+        self.window_length = window_length
+        self.polyorder = polyorder
+        self.half = window_length // 2
+        self.coeffs = savgol_coeffs(window_length, polyorder)
+        # Polynomial fits over the first/last window, as in mode="interp"
+        self.head_weights = np.array(
+            [
+                savgol_coeffs(window_length, polyorder, pos=pos, use="dot")
+                for pos in range(self.half)
+            ]
+        )
+        self.tail_weights = np.array(
+            [
+                savgol_coeffs(window_length, polyorder, pos=pos, use="dot")
+                for pos in range(self.half + 1, window_length)
+            ]
+        )
+        self.reset()
+
+    def reset(self):
+        self.samples_seen = 0
+        self.samples_emitted = 0
+        self._zi = np.zeros((self.num_vehicles, self.window_length - 1))
+        self._recent = np.empty((self.num_vehicles, 0))
+        self._single = False
+
+    # Feed new samples of shape (num_vehicles, n) (or (n,) when the smoother
+    # has a single vehicle) and return the newly finalized smoothed samples.
+    def update(self, samples):
+        samples = np.asarray(samples, dtype=float)
+        single = self._single = samples.ndim == 1 and self.num_vehicles == 1
+        if single:
+            samples = samples[None]
+        if samples.ndim != 2 or samples.shape[0] != self.num_vehicles:
+            raise ValueError(
+                f"expected samples of shape ({self.num_vehicles}, n), "
+                f"got {samples.shape}"
+            )
+        if samples.shape[1] == 0:
+            return samples[0] if single else samples
+
+        filtered, self._zi = lfilter(self.coeffs, 1.0, samples, axis=-1, zi=self._zi)
+        recent = np.concatenate([self._recent, samples], axis=1)
+        seen_before = self.samples_seen
+        self.samples_seen += samples.shape[1]
+
+        # filtered[:, j] is the centred value for sample seen_before + j - half,
+        # and only uses real data once a full window has been seen
+        start = max(0, self.window_length - 1 - seen_before)
+        smoothed = filtered[:, start:]
+        if seen_before < self.window_length <= self.samples_seen:
+            first_window = recent[:, : self.window_length]
+            head = first_window @ self.head_weights.T
+            smoothed = np.concatenate([head, smoothed], axis=1)
+
+        self._recent = recent[:, -self.window_length :]
+        self.samples_emitted += smoothed.shape[1]
+        return smoothed[0] if single else smoothed
+
+    # Smoothed values for the last window // 2 samples, fitted on the last
+    # window as savgol_filter does at the end of a series. These change as
+    # more samples arrive.
+    def provisional(self):
+        if self.samples_seen < self.window_length:
+            raise ValueError(
+                f"need at least {self.window_length} samples, "
+                f"got {self.samples_seen}"
+            )
+        tail = self._recent @ self.tail_weights.T
+        return tail[0] if self._single else tail
+
+
+# Reference (non-causal) smoothing of a batch of series, as applied by
+# generate_mobility_needs_profile on a single vehicle
+def smooth_mobility_needs(mobility_needs):
+    return savgol_filter(
+        mobility_needs,
+        window_length=SMOOTHING_WINDOW,
+        polyorder=SMOOTHING_POLYORDER,
+        axis=-1,
+    )
@@ -0,0 +1,246 @@
+import numpy as np
+import pandas as pd
+
+from powerschedule_fleet import (
+    CHUNK_SIZE,
+    POWER_MAX,
+    RESOLUTION,
+    SOURCE_NAMES,
+    slots_per_hour,
+    time_axis,
+)
+
+SKETCH_K = 200  # KLL accuracy parameter (rank error around 1.65 / k)
+HISTOGRAM_EDGES = np.linspace(0, POWER_MAX, 51)  # Per-slot power bins (kWh)
+QUANTILES = [0.5, 0.95]
+
+
+# KLL quantile sketch (Karnin, Lang & Liberty, 2016) over several series at
+# once. Every update adds the same number of values to every series, so
+# each level is a (series, items) array and compactions are vectorized.
+# Memory stays around 3k items per series whatever the number of values,
+# and two sketches with the same series merge into one.
+class KLLSketch:
+    def __init__(self, num_series, k=SKETCH_K, rng=None):
+        self.num_series = num_series
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty((num_series, 0))]
+        self.rng = np.random.default_rng(rng)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    # Compact every level over capacity: sort it and promote every other
+    # item (random offset) to the next level with twice the weight
+    def _compress(self):
+        compacted = True
+        while compacted:
+            compacted = False
+            for h in range(len(self.levels)):
+                level = self.levels[h]
+                if level.shape[1] <= self._capacity(h):
+                    continue
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty((self.num_series, 0)))
+                level = np.sort(level, axis=1)
+                keep = level.shape[1] % 2
+                promoted = level[:, keep + self.rng.integers(2) :: 2]
+                self.levels[h] = level[:, :keep]
+                self.levels[h + 1] = np.concatenate(
+                    [self.levels[h + 1], promoted], axis=1
+                )
+                compacted = True
+
+    # Add values of shape (n, num_series)
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).reshape(-1, self.num_series)
+        self.levels[0] = np.concatenate([self.levels[0], values.T], axis=1)
+        self.count += len(values)
+        self._compress()
+
+    def merge(self, other):
+        if other.num_series != self.num_series:
+            raise ValueError("cannot merge sketches with different series")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty((self.num_series, 0)))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level], axis=1)
+        self.count += other.count
+        self._compress()
+        return self
+
+    # Approximate quantiles, shape (len(quantiles), num_series)
+    def quantiles(self, quantiles=QUANTILES):
+        quantiles = np.atleast_1d(quantiles)
+        if self.count == 0:
+            return np.full((len(quantiles), self.num_series), np.nan)
+        items = np.concatenate(self.levels, axis=1)
+        weights = np.concatenate(
+            [np.full(level.shape[1], 2.0**h) for h, level in enumerate(self.levels)]
+        )
+        order = np.argsort(items, axis=1)
+        items = np.take_along_axis(items, order, axis=1)
+        cumulative = np.cumsum(weights[order], axis=1)
+        ranks = quantiles[:, None, None] * cumulative[None, :, -1:]
+        index = (cumulative[None] < ranks).sum(axis=2)
+        index = np.minimum(index, items.shape[1] - 1)
+        return np.take_along_axis(items[None], index[..., None], axis=2)[..., 0]
+
+
+# Running count, mean, variance, min and max per series, merged with Chan's
+# parallel update so chunks and processes can be combined in any order
+class RunningMoments:
+    def __init__(self, num_series):
+        self.count = 0
+        self.mean = np.zeros(num_series)
+        self.m2 = np.zeros(num_series)
+        self.min = np.full(num_series, np.inf)
+        self.max = np.full(num_series, -np.inf)
+
+    def _combine(self, count, mean, m2, minimum, maximum):
+        total = self.count + count
+        if total == 0:
+            return
+        delta = mean - self.mean
+        self.mean = self.mean + delta * count / total
+        self.m2 = self.m2 + m2 + delta**2 * self.count * count / total
+        self.count = total
+        self.min = np.minimum(self.min, minimum)
+        self.max = np.maximum(self.max, maximum)
+
+    # Add values of shape (n, num_series)
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+        if len(values) == 0:
+            return
+        mean = values.mean(axis=0)
+        m2 = ((values - mean) ** 2).sum(axis=0)
+        self._combine(len(values), mean, m2, values.min(axis=0), values.max(axis=0))
+
+    def merge(self, other):
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        return self
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / max(self.count - 1, 1))
+
+
+# Fixed-bin histogram per series, with an underflow and an overflow bin
+class RunningHistogram:
+    def __init__(self, num_series, edges=HISTOGRAM_EDGES):
+        self.edges = np.asarray(edges)
+        self.counts = np.zeros((num_series, len(self.edges) + 1), dtype=np.int64)
+
+    # Add values of shape (n, num_series)
+    def update(self, values):
+        num_series, num_bins = self.counts.shape
+        bins = np.searchsorted(
+            self.edges, np.asarray(values).reshape(-1, num_series), side="right"
+        )
+        flat = bins + np.arange(num_series) * num_bins
+        self.counts += np.bincount(flat.ravel(), minlength=self.counts.size).reshape(
+            self.counts.shape
+        )
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("cannot merge histograms with different edges")
+        self.counts += other.counts
+        return self
+
+
+# Fixed-size fleet statistics fed with (vehicles, sources, slots) chunks:
+# per-slot power quantiles, moments and histograms, and per-vehicle energy
+# quantiles and moments per source. Nothing of the raw chunks is kept, and
+# statistics from several processes can be merged.
+class FleetStatistics:
+    def __init__(
+        self,
+        num_slots,
+        sources=SOURCE_NAMES,
+        resolution=RESOLUTION,
+        k=SKETCH_K,
+        edges=HISTOGRAM_EDGES,
+        rng=None,
+    ):
+        self.sources = list(sources)
+        self.num_slots = num_slots
+        self.resolution = resolution
+        num_series = len(self.sources) * num_slots
+        rng = np.random.default_rng(rng)
+        self.power_sketch = KLLSketch(num_series, k, rng)
+        self.power_moments = RunningMoments(num_series)
+        self.power_histogram = RunningHistogram(num_series, edges)
+        self.energy_sketch = KLLSketch(len(self.sources), k, rng)
+        self.energy_moments = RunningMoments(len(self.sources))
+
+    def update(self, block):
+        power = block.reshape(len(block), -1)
+        self.power_sketch.update(power)
+        self.power_moments.update(power)
+        self.power_histogram.update(power)
+        energy = block.sum(axis=2, dtype=np.float64) / slots_per_hour(self.resolution)
+        self.energy_sketch.update(energy)
+        self.energy_moments.update(energy)
+        return self
+
+    def merge(self, other):
+        self.power_sketch.merge(other.power_sketch)
+        self.power_moments.merge(other.power_moments)
+        self.power_histogram.merge(other.power_histogram)
+        self.energy_sketch.merge(other.energy_sketch)
+        self.energy_moments.merge(other.energy_moments)
+        return self
+
+    @property
+    def num_vehicles(self):
+        return self.power_moments.count
+
+    # Per-slot quantiles as (quantiles, sources, slots)
+    def power_quantiles(self, quantiles=QUANTILES):
+        return self.power_sketch.quantiles(quantiles).reshape(
+            len(np.atleast_1d(quantiles)), len(self.sources), self.num_slots
+        )
+
+    # Per-vehicle energy quantiles as (quantiles, sources)
+    def energy_quantiles(self, quantiles=QUANTILES):
+        return self.energy_sketch.quantiles(quantiles)
+
+    # Per-slot summary in the long format used by the dashboards
+    def to_dataframe(self, quantiles=QUANTILES):
+        data = {
+            "Time (Hours)": np.tile(
+                time_axis(self.num_slots, self.resolution), len(self.sources)
+            ),
+            "Profile": np.repeat(self.sources, self.num_slots),
+            "Mean": self.power_moments.mean,
+            "Std": self.power_moments.std,
+            "Min": self.power_moments.min,
+            "Max": self.power_moments.max,
+        }
+        for q, values in zip(quantiles, self.power_quantiles(quantiles)):
+            data[f"P{round(q * 100)}"] = values.reshape(-1)
+        return pd.DataFrame(data)
+
+
+# Statistics of fleet chunks, e.g. from iter_fleet_chunks or
+# FleetStore.iter_chunks
+def fleet_statistics(chunks, num_slots, resolution=RESOLUTION, **kwargs):
+    stats = FleetStatistics(num_slots, resolution=resolution, **kwargs)
+    for _, block in chunks:
+        stats.update(block)
+    return stats
+
+
+# Statistics of a FleetStore, chunk by chunk
+def store_statistics(store, chunk_size=CHUNK_SIZE, **kwargs):
+    return fleet_statistics(
+        store.iter_chunks(chunk_size),
+        store.num_slots,
+        store.resolution,
+        sources=store.sources,
+        **kwargs,
+    )
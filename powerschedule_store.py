@@ -0,0 +1,139 @@
+import json
+import os
+
+import numpy as np
+
+from powerschedule_fleet import (
+    CHUNK_SIZE,
+    RESOLUTION,
+    SOURCE_NAMES,
+    TIME_PERIOD,
+    fleet_to_dataframe,
+    iter_fleet_chunks,
+    slots_per_hour,
+    totals_to_dataframe,
+)
+
+DATA_FILE = "fleet.dat"
+META_FILE = "fleet.json"
+SCHEMA = ["vehicle", "source", "slot"]
+
+
+# Fleet store backed by a numpy memmap of shape (vehicle, source, slot).
+# Data is written and read in chunks of vehicles, so peak memory is set by
+# the chunk size rather than by the size of the fleet.
+class FleetStore:
+    def __init__(self, path, mode="r"):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.sources = self.meta["sources"]
+        self.resolution = self.meta["resolution"]
+        self.shape = tuple(self.meta["shape"])
+        self.data = np.memmap(
+            os.path.join(path, DATA_FILE),
+            dtype=self.meta["dtype"],
+            mode=mode,
+            shape=self.shape,
+        )
+
+    @classmethod
+    def create(
+        cls,
+        path,
+        num_vehicles,
+        num_slots,
+        sources=SOURCE_NAMES,
+        resolution=RESOLUTION,
+        dtype="float32",
+    ):
+        os.makedirs(path, exist_ok=True)
+        meta = {
+            "schema": SCHEMA,
+            "shape": [num_vehicles, len(sources), num_slots],
+            "dtype": np.dtype(dtype).name,
+            "sources": list(sources),
+            "resolution": resolution,
+        }
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+        data = np.memmap(
+            os.path.join(path, DATA_FILE),
+            dtype=dtype,
+            mode="w+",
+            shape=tuple(meta["shape"]),
+        )
+        data.flush()
+        del data
+        return cls(path, mode="r+")
+
+    @property
+    def num_vehicles(self):
+        return self.shape[0]
+
+    @property
+    def num_slots(self):
+        return self.shape[2]
+
+    def write_chunk(self, start, block):
+        self.data[start : start + len(block)] = block
+
+    # Yield (first vehicle index, block) with blocks loaded into memory
+    def iter_chunks(self, chunk_size=CHUNK_SIZE):
+        for start in range(0, self.num_vehicles, chunk_size):
+            yield start, np.array(self.data[start : start + chunk_size])
+
+    def flush(self):
+        self.data.flush()
+
+
+# Generate a fleet straight into a new store, one chunk at a time
+def write_fleet(
+    path,
+    num_vehicles,
+    seed=None,
+    chunk_size=CHUNK_SIZE,
+    time_period=TIME_PERIOD,
+    resolution=RESOLUTION,
+    **kwargs,
+):
+    store = FleetStore.create(
+        path,
+        num_vehicles,
+        time_period * slots_per_hour(resolution),
+        resolution=resolution,
+    )
+    for start, block in iter_fleet_chunks(
+        num_vehicles,
+        chunk_size,
+        seed,
+        time_period=time_period,
+        resolution=resolution,
+        **kwargs,
+    ):
+        store.write_chunk(start, block)
+    store.flush()
+    return store
+
+
+# Per-slot fleet totals (sources, slots), accumulated chunk by chunk
+def aggregate_store(store, chunk_size=CHUNK_SIZE):
+    totals = np.zeros(store.shape[1:])
+    for _, block in store.iter_chunks(chunk_size):
+        totals += block.sum(axis=0, dtype=np.float64)
+    return totals
+
+
+# Fleet totals in the long format used by the dashboards
+def aggregate_store_dataframe(store, chunk_size=CHUNK_SIZE):
+    return totals_to_dataframe(
+        aggregate_store(store, chunk_size), store.sources, store.resolution
+    )
+
+
+# Export the store to a long-format CSV, one chunk at a time
+def export_csv(store, path, chunk_size=CHUNK_SIZE):
+    for start, block in store.iter_chunks(chunk_size):
+        fleet_to_dataframe(block, start, store.sources, store.resolution).to_csv(
+            path, mode="w" if start == 0 else "a", header=start == 0, index=False
+        )
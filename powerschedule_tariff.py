@@ -0,0 +1,169 @@
+import numpy as np
+
+from powerschedule_fleet import (
+    CHUNK_SIZE,
+    PROFILE_NAMES,
+    RESOLUTION,
+    SOURCE_NAMES,
+    TIME_PERIOD,
+    slots_per_hour,
+)
+
+# Example tariffs. Prices are per kWh, demand charges per kW of peak power.
+# periods are time-of-use windows in hours (end may wrap past midnight);
+# source_prices override the time-of-use price for on-site sources, and
+# demand_sources are the sources that count towards the demand charge.
+TARIFFS = {
+    "Flat": {
+        "default_price": 0.25,
+        "source_prices": {"Solar Power": 0.08, "Surplus Solar": 0.0},
+        "demand_charge": 0.0,
+    },
+    "Peak/Off-Peak": {
+        "default_price": 0.22,
+        "periods": [
+            {"start": 22, "end": 6, "price": 0.15},
+            {"start": 17, "end": 21, "price": 0.32},
+        ],
+        "source_prices": {"Solar Power": 0.08, "Surplus Solar": 0.0},
+        "demand_charge": 9.5,
+        "demand_sources": ["Grid Energy"],
+    },
+}
+
+
+# Precompile a tariff into per-slot price vectors for the active resolution.
+# weights[source, slot] is the cost of 1 kW held for that slot, so the cost
+# of a (sources, slots) schedule is a single dot product with it. Rows for
+# sources without a price (mobility needs) are zero.
+def compile_tariff(
+    tariff,
+    time_period=TIME_PERIOD,
+    resolution=RESOLUTION,
+    sources=SOURCE_NAMES,
+    name=None,
+):
+    sph = slots_per_hour(resolution)
+    hours = (np.arange(time_period * sph) / sph) % 24
+
+    grid_prices = np.full(len(hours), float(tariff.get("default_price", 0.0)))
+    for period in tariff.get("periods", []):
+        start, end = period["start"], period["end"]
+        if start < end:
+            in_period = (start <= hours) & (hours < end)
+        else:
+            in_period = (start <= hours) | (hours < end)
+        grid_prices[in_period] = period["price"]
+
+    source_prices = tariff.get("source_prices", {})
+    prices = np.zeros((len(sources), len(hours)))
+    for i, source in enumerate(sources):
+        if source not in PROFILE_NAMES:
+            continue
+        price = source_prices.get(source)
+        prices[i] = grid_prices if price is None else price
+
+    weights = prices / sph
+    demand_sources = tariff.get("demand_sources", ["Grid Energy"])
+    return {
+        "name": name,
+        "prices": prices,
+        "weights": weights,
+        "cumulative": np.concatenate(
+            [np.zeros((len(sources), 1)), np.cumsum(weights, axis=1)], axis=1
+        ),
+        "demand_charge": float(tariff.get("demand_charge", 0.0)),
+        "demand_mask": np.array([source in demand_sources for source in sources]),
+        "resolution": resolution,
+        "time_period": time_period,
+    }
+
+
+# Compile every tariff of a {name: tariff} table
+def compile_tariffs(tariffs=TARIFFS, time_period=TIME_PERIOD, resolution=RESOLUTION):
+    return [
+        compile_tariff(tariff, time_period, resolution, name=name)
+        for name, tariff in tariffs.items()
+    ]
+
+
+# Energy cost per vehicle of a fleet block (vehicles, sources, slots): one
+# matrix-vector product over the flattened schedules
+def vehicle_energy_costs(block, compiled):
+    flat = block.reshape(len(block), -1)
+    return flat @ compiled["weights"].reshape(-1).astype(block.dtype)
+
+
+# Energy cost of every vehicle under every tariff, (vehicles, tariffs), as a
+# single matrix product against the stacked price vectors
+def energy_cost_matrix(block, compiled_tariffs):
+    stacked = np.stack([c["weights"].reshape(-1) for c in compiled_tariffs], axis=1)
+    return block.reshape(len(block), -1) @ stacked.astype(block.dtype)
+
+
+# Per-slot power drawn by the demand sources, summed over the vehicles
+def demand_profile(block, compiled):
+    return block[:, compiled["demand_mask"]].sum(axis=(0, 1), dtype=np.float64)
+
+
+# Demand charge on the peak of an aggregated (slots,) demand profile
+def demand_cost(demand, compiled):
+    return compiled["demand_charge"] * float(np.max(demand, initial=0.0))
+
+
+# Energy and demand cost of a whole fleet block under one tariff
+def fleet_cost(block, compiled):
+    vehicle_costs = vehicle_energy_costs(block, compiled)
+    energy = float(vehicle_costs.sum(dtype=np.float64))
+    demand = demand_cost(demand_profile(block, compiled), compiled)
+    return {
+        "vehicle_energy_costs": vehicle_costs,
+        "energy_cost": energy,
+        "demand_cost": demand,
+        "total_cost": energy + demand,
+    }
+
+
+# Fleet cost of a FleetStore, chunk by chunk. The demand charge applies to
+# the site peak, so the demand profile is accumulated before taking the max.
+def store_cost(store, compiled, chunk_size=CHUNK_SIZE):
+    energy = 0.0
+    demand = np.zeros(store.num_slots)
+    for _, block in store.iter_chunks(chunk_size):
+        energy += float(vehicle_energy_costs(block, compiled).sum(dtype=np.float64))
+        demand += demand_profile(block, compiled)
+    demand_charge = demand_cost(demand, compiled)
+    return {
+        "energy_cost": energy,
+        "demand_cost": demand_charge,
+        "total_cost": energy + demand_charge,
+    }
+
+
+# Step form of a fleet block: one row per constant-power interval, as
+# (vehicle, source, start slot, end slot, level) arrays
+def extract_steps(block):
+    num_slots = block.shape[-1]
+    changes = np.ones(block.shape, dtype=bool)
+    np.not_equal(block[..., 1:], block[..., :-1], out=changes[..., 1:])
+    vehicle, source, start = np.nonzero(changes)
+    if start.size == 0:
+        return vehicle, source, start, start.copy(), block[vehicle, source, start]
+    end = np.empty_like(start)
+    end[:-1] = start[1:]
+    end[-1] = num_slots
+    # The next step may belong to another row: close the row at num_slots
+    row = vehicle * block.shape[1] + source
+    last = np.ones(len(row), dtype=bool)
+    last[:-1] = row[1:] != row[:-1]
+    end[last] = num_slots
+    return vehicle, source, start, end, block[vehicle, source, start]
+
+
+# Energy cost per vehicle of step profiles: each step costs its level times
+# the price integrated over [start, end), read from the cumulative prices
+def step_energy_costs(steps, compiled, num_vehicles=0):
+    vehicle, source, start, end, level = steps
+    cumulative = compiled["cumulative"]
+    interval_prices = cumulative[source, end] - cumulative[source, start]
+    return np.bincount(vehicle, weights=level * interval_prices, minlength=num_vehicles)
@@ -0,0 +1,146 @@
+import numpy as np
+
+from powerschedule_fleet import (
+    CHUNK_SIZE,
+    LOW_POWER_FRACTION,
+    POWER_MAX,
+    POWER_MIN,
+    PRIORITY_WINDOWS,
+    PROFILE_NAMES,
+    RESOLUTION,
+    STEP_MAX_DURATION,
+    TIME_PERIOD,
+    priority_window_mask,
+    slots_per_hour,
+)
+
+# Violation bits, one uint8 mask per vehicle
+BOUNDS = 1  # A charging slot is outside [power_min, power_max] or missing
+HORIZON = 2  # The schedule does not cover the full time period (or has NaN)
+ENERGY = 4  # Delivered energy is below the mobility needs
+WINDOW = 8  # A step level does not match its priority window
+DURATION = 16  # A step lasts longer than STEP_MAX_DURATION
+VIOLATIONS = {
+    "bounds": BOUNDS,
+    "horizon": HORIZON,
+    "energy": ENERGY,
+    "window": WINDOW,
+    "duration": DURATION,
+}
+TOLERANCE = 1e-3  # Absolute tolerance on power (float32 storage)
+
+
+# Check a fleet block (vehicles, sources, slots) with the charging profiles
+# first and the mobility needs last. Every check is a whole-array operation,
+# so the cost is a few passes over the block.
+def validate_fleet(
+    block,
+    resolution=RESOLUTION,
+    time_period=TIME_PERIOD,
+    power_min=POWER_MIN,
+    power_max=POWER_MAX,
+    priority_windows=PRIORITY_WINDOWS,
+):
+    block = np.ascontiguousarray(block)
+    num_vehicles = block.shape[0]
+    num_profiles = len(PROFILE_NAMES)
+    charging = block[:, :num_profiles]
+    flags = np.zeros(num_vehicles, dtype=np.uint8)
+    if num_vehicles == 0:
+        return _report(flags)
+
+    # Horizon: right number of slots
+    sph = slots_per_hour(resolution)
+    if block.shape[-1] != time_period * sph:
+        flags |= HORIZON
+        return _report(flags)
+
+    # Bounds (NaN compares False, so missing slots are out of bounds too).
+    # Per-vehicle flags are only worked out when the whole block fails.
+    lower = block.dtype.type(power_min - TOLERANCE)
+    upper = block.dtype.type(power_max + TOLERANCE)
+    if not (charging.min() >= lower and charging.max() <= upper):
+        in_bounds = (charging >= lower) & (charging <= upper)
+        flags[~in_bounds.all(axis=(1, 2))] |= BOUNDS
+
+    # Energy sufficiency: charging sources together must cover the needs.
+    # Per-source totals come from one matrix-vector product; NaN propagates
+    # through it, which also marks slots missing from the horizon.
+    num_slots = block.shape[-1]
+    totals = block.reshape(-1, num_slots) @ np.ones(num_slots, dtype=block.dtype)
+    totals = totals.reshape(num_vehicles, -1)
+    delivered = totals[:, :num_profiles].sum(axis=1)
+    required = totals[:, num_profiles]
+    flags[delivered < required - TOLERANCE * num_slots] |= ENERGY
+    flags[np.isnan(delivered) | np.isnan(required)] |= HORIZON
+
+    # Steps start on the hour; a step starts wherever the hourly level changes
+    hourly = charging[..., ::sph]
+    step_starts = np.empty(hourly.shape, dtype=bool)
+    step_starts[..., 0] = True
+    np.not_equal(hourly[..., 1:], hourly[..., :-1], out=step_starts[..., 1:])
+
+    # Priority windows: the level of a step is drawn for its starting hour
+    priority_windows = {name: priority_windows[name] for name in PROFILE_NAMES}
+    in_window = priority_window_mask(time_period, priority_windows)
+    high_fraction = np.array(
+        [settings["high_fraction"] for settings in priority_windows.values()]
+    )[:, None]
+    low = np.where(in_window, power_max * high_fraction, power_min) - TOLERANCE
+    high = np.where(in_window, power_max, power_max * LOW_POWER_FRACTION) + TOLERANCE
+    bad_level = hourly < low.astype(block.dtype)
+    bad_level |= hourly > high.astype(block.dtype)
+    bad_level &= step_starts
+    if bad_level.any():
+        flags[bad_level.any(axis=(1, 2))] |= WINDOW
+
+    # Step durations: STEP_MAX_DURATION hours in a row without a step start
+    # means the step before them is too long
+    quiet = ~step_starts
+    span = time_period - STEP_MAX_DURATION + 1
+    if span > 0:
+        too_long = quiet[..., :span].copy()
+        for k in range(1, STEP_MAX_DURATION):
+            too_long &= quiet[..., k : k + span]
+        if too_long.any():
+            flags[too_long.any(axis=(1, 2))] |= DURATION
+
+    return _report(flags)
+
+
+def _report(flags):
+    counts = {
+        name: int(np.count_nonzero(flags & bit)) for name, bit in VIOLATIONS.items()
+    }
+    return {
+        "flags": flags,
+        "counts": counts,
+        "num_vehicles": len(flags),
+        "num_invalid": int(np.count_nonzero(flags)),
+    }
+
+
+# Validate a FleetStore chunk by chunk and combine the reports
+def validate_store(
+    store, chunk_size=CHUNK_SIZE, priority_windows=PRIORITY_WINDOWS, **kwargs
+):
+    time_period = store.num_slots // slots_per_hour(store.resolution)
+    flags = np.concatenate(
+        [np.zeros(0, dtype=np.uint8)]
+        + [
+            validate_fleet(
+                block,
+                store.resolution,
+                time_period=time_period,
+                priority_windows=priority_windows,
+                **kwargs,
+            )["flags"]
+            for _, block in store.iter_chunks(chunk_size)
+        ]
+    )
+    return _report(flags)
+
+
+# Vehicle indices whose mask has any of the given violation bits
+def invalid_vehicles(report, violations=0xFF):
+    return np.flatnonzero(report["flags"] & violations)